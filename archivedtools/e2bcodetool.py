@@ -4,7 +4,12 @@ from dotenv import load_dotenv
 import os
 import time
 import json
-import base64
+
+# pybase64 is a SIMD-accelerated drop-in for the stdlib module
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
 
 class E2bCodeTool(BaseTool):
     name = "e2bcodetool"
